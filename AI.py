@@ -1,64 +1,167 @@
+import io
 import re
-import json
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from collections import Counter
 from datetime import datetime, timedelta
+from functools import lru_cache, partial
 
 # --- AI Chat Feature ---
+# Error/warning lines kept per analysis; the chat UI only shows the first few
+MAX_LINE_SAMPLES = 50
+
+def _as_text(log_content):
+    """Return log content as a single string, reading it if it is a file"""
+    return log_content if isinstance(log_content, str) else log_content.read()
+
+def _sample_count(samples, shown=0):
+    """Count of sampled lines beyond `shown`, marked with + once the cap was hit"""
+    remaining = len(samples) - shown
+    return f"{remaining}+" if len(samples) >= MAX_LINE_SAMPLES else str(remaining)
+
 class LogAnalyzer:
     def __init__(self):
         self.patterns = {
-            'error': r'(error|exception|failed|failure|crash|segfault)',
-            'warning': r'(warning|warn|caution|attention)',
+            'error': r'(?:error|exception|fail(?:ed|ure)|crash|segfault)',
+            'warning': r'(?:warn(?:ing)?|caution|attention)',
             'http_status': r'HTTP/\d\.\d"\s+(\d{3})',
             'timestamp': r'(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})|(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})',
             'ip_address': r'\b(?:\d{1,3}\.){3}\d{1,3}\b',
             'url': r'(GET|POST|PUT|DELETE)\s+([^\s]+)',
-            'database': r'(database|sql|query|transaction|connection)',
-            'memory': r'(memory|ram|oom|out of memory)',
-            'disk': r'(disk|space|storage|full)',
-            'performance': r'(slow|timeout|latency|performance|bottleneck)'
+            'database': r'(?:database|sql|query|transaction|connection)',
+            'memory': r'(?:memory|ram|oom|out of memory)',
+            'disk': r'(?:disk|space|storage|full)',
+            'performance': r'(?:slow|timeout|latency|performance|bottleneck)'
         }
+        # Combined scanner run over the whole analyzed window. The url
+        # alternative only consumes the method (the path is captured by
+        # lookahead) so keywords and IPs inside the request path are still
+        # found by the same scan; [^\S\n] keeps every match within one line.
+        # The leading lookahead lists every character an alternative can start
+        # with, letting the engine reject most positions with one set test
+        # instead of trying each branch.
+        keyword_alternatives = [
+            r'(?P<error>(?i:%s))' % self.patterns['error'],
+            r'(?P<warning>(?i:%s))' % self.patterns['warning'],
+        ]
+        traffic_alternatives = [
+            r'(?P<http_status>HTTP/\d\.\d"[^\S\n]+(?P<status>\d{3}))',
+            r'(?P<ip_address>%s)' % self.patterns['ip_address'],
+            r'(?P<url>(?P<method>GET|POST|PUT|DELETE)(?=[^\S\n]+(?P<path>[^\s]+)))',
+        ]
+        self._line_scanner = re.compile(r'(?=(?i:[efcswa])|[HGPD\d])(?:%s)' % '|'.join(
+            keyword_alternatives + traffic_alternatives
+        ))
+        # Switched to once the error and warning samples are full: errors are
+        # still watched for the memory/database suggestions until both are seen
+        self._error_traffic_scanner = re.compile(r'(?=(?i:[efcs])|[HGPD\d])(?:%s)' % '|'.join(
+            keyword_alternatives[:1] + traffic_alternatives
+        ))
+        self._traffic_scanner = re.compile(r'(?=[HGPD\d])(?:%s)' % '|'.join(traffic_alternatives))
+        # Every error/warning match contains one of these; if none occur in
+        # the window the keyword alternatives cannot match anywhere
+        self._keyword_literals = ('error', 'exception', 'fail', 'crash', 'segfault',
+                                  'warn', 'caution', 'attention')
     
     def analyze_log_patterns(self, log_content):
-        """Analyze log content for common patterns"""
+        """Analyze log content (text or an open text file) for common patterns"""
         analysis = {
             'errors': [],
             'warnings': [],
-            'http_codes': {},
+            'http_codes': Counter(),
             'timestamps': [],
-            'ips': [],
+            'ips': set(),
             'urls': [],
+            # Set from every error line, including those past the sample cap
+            'memory_errors': False,
+            'database_errors': False,
             'suggestions': []
         }
         
-        lines = log_content.split('\n')
+        # Only the first 1000 lines are analyzed, so pull them lazily rather
+        # than splitting (or reading) the whole log
+        lines = io.StringIO(log_content) if isinstance(log_content, str) else log_content
+        buf = ''.join(islice(lines, 1000))
         
-        for i, line in enumerate(lines[:1000]):  # Analyze first 1000 lines
-            line = line.strip()
-            if not line:
-                continue
+        # Bind hot-loop lookups to locals
+        count_newlines = buf.count
+        ips_add = analysis['ips'].add
+        urls_append = analysis['urls'].append
+        http_codes = analysis['http_codes']
+        
+        def line_at(pos):
+            end = buf.find('\n', pos)
+            return buf[buf.rfind('\n', 0, pos) + 1:end if end != -1 else len(buf)].strip()
+        
+        # One scan over the window; line numbers come from counting newlines
+        # between consecutive matches. Errors, warnings, HTTP codes and URLs
+        # are recorded once per line, IP addresses every time they appear.
+        # Error and warning samples stop at MAX_LINE_SAMPLES; once both are
+        # full the rest of the window is scanned for traffic data, plus errors
+        # until both the memory and database flags are set.
+        errors = analysis['errors']
+        warnings = analysis['warnings']
+        scanner = self._line_scanner
+        # Substring checks run at memchr speed, so a window with no keyword at
+        # all (common for access logs) skips straight to the traffic scanner.
+        # Only on ASCII text, where lower() agrees with IGNORECASE matching.
+        if buf.isascii():
+            buf_lower = buf.lower()
+            if not any(word in buf_lower for word in self._keyword_literals):
+                scanner = self._traffic_scanner
+        memory_errors = database_errors = False
+        line_no = 1
+        last_pos = 0
+        seen = set()
+        resume_at = 0
+        while resume_at is not None:
+            matches = scanner.finditer(buf, resume_at)
+            resume_at = None
+            for match in matches:
+                pos = match.start()
+                newlines = count_newlines('\n', last_pos, pos)
+                if newlines:
+                    line_no += newlines
+                    seen.clear()
+                last_pos = pos
                 
-            # Check for errors
-            if re.search(self.patterns['error'], line, re.IGNORECASE):
-                analysis['errors'].append(f"Line {i+1}: {line[:100]}...")
-            
-            # Check for warnings
-            if re.search(self.patterns['warning'], line, re.IGNORECASE):
-                analysis['warnings'].append(f"Line {i+1}: {line[:100]}...")
-            
-            # Extract HTTP status codes
-            http_match = re.search(self.patterns['http_status'], line)
-            if http_match:
-                status_code = http_match.group(1)
-                analysis['http_codes'][status_code] = analysis['http_codes'].get(status_code, 0) + 1
-            
-            # Extract IP addresses
-            ips = re.findall(self.patterns['ip_address'], line)
-            analysis['ips'].extend(ips)
-            
-            # Extract URLs
-            url_match = re.search(self.patterns['url'], line)
-            if url_match:
-                analysis['urls'].append(f"{url_match.group(1)} {url_match.group(2)}")
+                kind = match.lastgroup
+                if kind == 'ip_address':
+                    ips_add(match.group())
+                    continue
+                if kind in seen:
+                    continue
+                seen.add(kind)
+                
+                if kind == 'error' or kind == 'warning':
+                    line = line_at(pos)[:100]
+                    samples = errors if kind == 'error' else warnings
+                    if len(samples) < MAX_LINE_SAMPLES:
+                        samples.append(f"Line {line_no}: {line}...")
+                    if kind == 'error':
+                        line_lower = line.lower()
+                        memory_errors = memory_errors or 'memory' in line_lower
+                        database_errors = database_errors or 'database' in line_lower
+                    
+                    if len(errors) >= MAX_LINE_SAMPLES and len(warnings) >= MAX_LINE_SAMPLES:
+                        if memory_errors and database_errors:
+                            next_scanner = self._traffic_scanner
+                        else:
+                            next_scanner = self._error_traffic_scanner
+                        if next_scanner is not scanner:
+                            scanner = next_scanner
+                            resume_at = match.end()
+                            break
+                elif kind == 'http_status':
+                    status_code = match.group('status')
+                    http_codes[status_code] += 1
+                elif kind == 'url':
+                    urls_append(f"{match.group('method')} {match.group('path')}")
+        
+        analysis['memory_errors'] = memory_errors
+        analysis['database_errors'] = database_errors
         
         # Generate suggestions based on findings
         analysis['suggestions'] = self.generate_suggestions(analysis)
@@ -81,10 +184,10 @@ class LogAnalyzer:
         if len(analysis['warnings']) > 20:
             suggestions.append("Numerous warnings found. Review application logs for potential issues.")
         
-        if any('memory' in error.lower() for error in analysis['errors']):
+        if analysis['memory_errors']:
             suggestions.append("Memory-related issues detected. Check memory usage and allocation.")
         
-        if any('database' in error.lower() for error in analysis['errors']):
+        if analysis['database_errors']:
             suggestions.append("Database errors found. Verify database connection and queries.")
         
         if not suggestions:
@@ -92,28 +195,42 @@ class LogAnalyzer:
         
         return suggestions
     
-    def process_query(self, query, log_content, log_filename):
-        """Process user query and provide intelligent response"""
+    def process_query(self, query, log_content, log_filename, analysis=None, get_grep=None):
+        """Process user query and provide intelligent response.
+        
+        log_content may be the log text or an open log file; pattern analysis
+        and searches only read the lines they need, counts read the rest.
+        A precomputed analysis, or a callable returning one (e.g.
+        partial(analyze_log_file, path)), skips the rescan; a callable is only
+        invoked by queries that need the analysis. get_grep (e.g.
+        partial(grep_runner, path)) is called once a count or search term is
+        known; the grep runner it returns answers ASCII terms without reading
+        the log into Python at all.
+        """
         query_lower = query.lower()
         
+        def get_analysis():
+            if callable(analysis):
+                return analysis()
+            if analysis is not None:
+                return analysis
+            return self.analyze_log_patterns(log_content)
+        
         # Common question patterns
         if any(word in query_lower for word in ['error', 'problem', 'issue', 'wrong']):
-            analysis = self.analyze_log_patterns(log_content)
-            return self.format_error_analysis(analysis, log_filename)
+            return self.format_error_analysis(get_analysis(), log_filename)
         
         elif any(word in query_lower for word in ['summary', 'overview', 'analyze']):
-            analysis = self.analyze_log_patterns(log_content)
-            return self.format_summary(analysis, log_filename)
+            return self.format_summary(get_analysis(), log_filename)
         
         elif any(word in query_lower for word in ['suggest', 'recommend', 'advice']):
-            analysis = self.analyze_log_patterns(log_content)
-            return self.format_suggestions(analysis, log_filename)
+            return self.format_suggestions(get_analysis(), log_filename)
         
         elif any(word in query_lower for word in ['count', 'how many', 'number']):
-            return self.count_patterns(query, log_content)
+            return self.count_patterns(query, log_content, get_grep)
         
         elif any(word in query_lower for word in ['find', 'search', 'locate']):
-            return self.search_specific(query, log_content)
+            return self.search_specific(query, log_content, get_grep)
         
         else:
             return {
@@ -125,11 +242,11 @@ class LogAnalyzer:
         response = f"## Error Analysis for {filename}\n\n"
         
         if analysis['errors']:
-            response += f"**Found {len(analysis['errors'])} errors:**\n"
+            response += f"**Found {_sample_count(analysis['errors'])} errors:**\n"
             for error in analysis['errors'][:5]:  # Show first 5 errors
                 response += f"- {error}\n"
             if len(analysis['errors']) > 5:
-                response += f"- ... and {len(analysis['errors']) - 5} more errors\n"
+                response += f"- ... and {_sample_count(analysis['errors'], 5)} more errors\n"
         else:
             response += "No errors detected in the analyzed portion.\n"
         
@@ -137,10 +254,11 @@ class LogAnalyzer:
     
     def format_summary(self, analysis, filename):
         response = f"## Log Summary for {filename}\n\n"
-        response += f"- **Errors found:** {len(analysis['errors'])}\n"
-        response += f"- **Warnings found:** {len(analysis['warnings'])}\n"
-        response += f"- **HTTP Status Codes:** {json.dumps(analysis['http_codes'], indent=2)}\n"
-        response += f"- **Unique IPs:** {len(set(analysis['ips']))}\n"
+        response += f"- **Errors found:** {_sample_count(analysis['errors'])}\n"
+        response += f"- **Warnings found:** {_sample_count(analysis['warnings'])}\n"
+        http_codes = ', '.join(f"{code}: {count}" for code, count in sorted(analysis['http_codes'].items()))
+        response += f"- **HTTP Status Codes:** {http_codes or 'none'}\n"
+        response += f"- **Unique IPs:** {len(analysis['ips'])}\n"
         response += f"- **URLs accessed:** {len(analysis['urls'])}\n"
         
         return {'response': response, 'type': 'summary'}
@@ -153,8 +271,7 @@ class LogAnalyzer:
         
         return {'response': response, 'type': 'suggestions'}
     
-    def count_patterns(self, query, log_content):
-        lines = log_content.split('\n')
+    def count_patterns(self, query, log_content, get_grep=None):
         count = 0
         pattern = None
         
@@ -165,10 +282,23 @@ class LogAnalyzer:
                 pattern = word
                 break
         
+        grep = get_grep() if pattern and get_grep and pattern.isascii() else None
+        if grep:
+            count = int(grep(['-c', '-i', '-F', '-e', pattern]).strip() or 0)
+        elif pattern:
+            # Lowercase once and let str.find do the scanning; after each hit
+            # jump to the next line so every line is counted at most once
+            log_lower = _as_text(log_content).lower()
+            find = log_lower.find
+            idx = find(pattern)
+            while idx != -1:
+                count += 1
+                line_end = find('\n', idx)
+                if line_end == -1:
+                    break
+                idx = find(pattern, line_end + 1)
+        
         if pattern:
-            for line in lines:
-                if pattern in line.lower():
-                    count += 1
             return {
                 'response': f"Found {count} lines containing '{pattern}' in the log file.",
                 'type': 'count'
@@ -179,8 +309,7 @@ class LogAnalyzer:
                 'type': 'info'
             }
     
-    def search_specific(self, query, log_content):
-        lines = log_content.split('\n')
+    def search_specific(self, query, log_content, get_grep=None):
         results = []
         search_term = None
         
@@ -191,13 +320,26 @@ class LogAnalyzer:
                 search_term = words[i + 1]
                 break
         
-        if search_term:
-            for i, line in enumerate(lines):
+        grep = get_grep() if search_term and get_grep and search_term.isascii() else None
+        if grep:
+            output = grep(['-n', '-i', '-F', '-m', '10', '-e', search_term])
+            for result in output.split('\n')[:-1]:
+                line_num, line = result.split(':', 1)
+                line = line.rstrip('\r')
+                results.append(f"Line {line_num}: {line[:200]}...")
+        elif search_term and isinstance(log_content, str):
+            results = self._matching_lines(log_content, search_term)
+        elif search_term:
+            # Open log file: read lines lazily and stop at the tenth hit
+            # instead of loading the rest of the file
+            for i, line in enumerate(log_content):
                 if search_term in line.lower():
+                    line = line.rstrip('\n')
                     results.append(f"Line {i+1}: {line[:200]}...")
                     if len(results) >= 10:  # Limit results
                         break
-            
+        
+        if search_term:
             if results:
                 response = f"**Found {len(results)} lines containing '{search_term}':**\n\n"
                 for result in results:
@@ -213,12 +355,131 @@ class LogAnalyzer:
                 'response': "Please specify what you want to search for. Example: 'find error' or 'search timeout'",
                 'type': 'info'
             }
+    
+    def _matching_lines(self, log_content, term, limit=10):
+        """First `limit` lines containing term (case-insensitive), formatted for display"""
+        results = []
+        log_lower = log_content.lower()
+        content_len = len(log_content)
+        
+        if len(log_lower) == content_len:
+            # Lowercase once and jump between hits with str.find; line numbers
+            # come from counting the newlines skipped since the previous hit
+            find = log_lower.find
+            line_num = 1
+            counted_to = 0
+            idx = find(term)
+            while idx != -1:
+                line_num += log_lower.count('\n', counted_to, idx)
+                counted_to = idx
+                line_start = log_lower.rfind('\n', 0, idx) + 1
+                line_end = find('\n', idx)
+                if line_end == -1:
+                    line_end = content_len
+                results.append(f"Line {line_num}: {log_content[line_start:line_end][:200]}...")
+                if len(results) >= limit:
+                    break
+                idx = find(term, line_end + 1)
+            return results
+        
+        # lower() changed the length of some characters (e.g. 'İ'), so offsets
+        # in log_lower do not line up; walk the original line by line instead
+        find = log_content.find
+        start = 0
+        line_num = 1
+        while start <= content_len:
+            end = find('\n', start)
+            if end == -1:
+                end = content_len
+            line = log_content[start:end]
+            if term in line.lower():
+                results.append(f"Line {line_num}: {line[:200]}...")
+                if len(results) >= limit:
+                    break
+            start = end + 1
+            line_num += 1
+        return results
 
 # Initialize the log analyzer
 log_analyzer = LogAnalyzer()
 
 
 
+def grep_file(log_path, args):
+    """Run grep with the given options over a local log file, return stdout.
+    
+    grep runs in the C locale, where -i only folds ASCII letters, so callers
+    use it for ASCII terms only. Output is decoded here rather than in text
+    mode so a lone '\r' in a matched line is not turned into a line break.
+    """
+    # -a: logs with stray binary bytes are still searched as text
+    result = subprocess.run(
+        ['grep', '-a', *args, '--', log_path],
+        capture_output=True, env={**os.environ, 'LC_ALL': 'C'}
+    )
+    if result.returncode > 1:  # 1 only means no lines matched
+        stderr = result.stderr.decode('utf-8', 'ignore').strip()
+        raise RuntimeError(stderr or f"grep failed on {log_path}")
+    return result.stdout.decode('utf-8', 'ignore')
+
+@lru_cache(maxsize=64)
+def _has_lone_cr(path, mtime_ns, size):
+    """Whether the file has a '\r' that does not end a line; mtime/size key the cache"""
+    result = subprocess.run(
+        ['grep', '-a', '-q', '-P', r'\r(?!$)', '--', path],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env={**os.environ, 'LC_ALL': 'C'}
+    )
+    # 0 = found; anything but a clean "no match" is treated as found too
+    return result.returncode != 1
+
+def grep_runner(log_path):
+    """grep_file bound to log_path, or None when grep cannot stand in for Python.
+    
+    The Python path reads logs with universal newlines, so a lone '\r' starts
+    a new line there but not in grep; such files are left to Python.
+    """
+    if not shutil.which('grep'):
+        return None
+    stat = os.stat(log_path)
+    if _has_lone_cr(log_path, stat.st_mtime_ns, stat.st_size):
+        return None
+    return partial(grep_file, log_path)
+
+@lru_cache(maxsize=64)
+def _analyze_cached(path, mtime_ns, size):
+    """Analyze a local log file; mtime and size are part of the cache key"""
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        return log_analyzer.analyze_log_patterns(f)
+
+def analyze_log_file(path):
+    """Return the (cached) pattern analysis for a log file.
+    
+    The result is shared between callers and must not be modified.
+    """
+    stat = os.stat(path)
+    return _analyze_cached(path, stat.st_mtime_ns, stat.st_size)
+
+
+# Background SSH work for the chat page; the listing wait outlasts the
+# 10s connect timeout in _get_ssh_client
+_chat_executor = ThreadPoolExecutor(max_workers=8)
+LOG_LIST_TIMEOUT = 15
+
+def _list_remote_logs(hostname_config, username, password):
+    """List the files in a host's log_dir over SSH"""
+    client = _get_ssh_client(hostname_config, username, password)
+    if not client:
+        return []
+    try:
+        stdin, stdout, stderr = client.exec_command(f"ls {hostname_config['log_dir']}")
+        log_files = stdout.read().decode().strip().split('\n')
+        log_files = [f for f in log_files if f]  # Remove empty strings
+        log_files.sort()
+        return log_files
+    finally:
+        client.close()
+
+
 # --- AI Chat Routes ---
 @app.route('/chat/<hostname_key>', methods=['GET', 'POST'])
 def chat_interface(hostname_key):
@@ -231,6 +492,13 @@ def chat_interface(hostname_key):
     if not credentials:
         return redirect(url_for('authenticate'))
     
+    # Start the remote log listing now so the SSH round trip overlaps with
+    # answering the question below
+    hostname_config = HOST_CONFIG.get(hostname_key)
+    log_files_future = _chat_executor.submit(
+        _list_remote_logs, hostname_config, credentials['username'], credentials['password']
+    )
+    
     chat_history = session.get('chat_history', [])
     
     if request.method == 'POST':
@@ -241,11 +509,11 @@ def chat_interface(hostname_key):
             # Read the log file
             log_path = os.path.join(LOGS_DIR, selected_log)
             try:
+                # Get AI response, streaming the file instead of reading it up front
+                analysis = partial(analyze_log_file, log_path)
+                get_grep = partial(grep_runner, log_path)
                 with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    log_content = f.read()
-                
-                # Get AI response
-                ai_response = log_analyzer.process_query(user_message, log_content, selected_log)
+                    ai_response = log_analyzer.process_query(user_message, f, selected_log, analysis, get_grep)
                 
                 # Update chat history
                 chat_history.append({
@@ -273,18 +541,11 @@ def chat_interface(hostname_key):
                 })
     
     # Get available log files
-    hostname_config = HOST_CONFIG.get(hostname_key)
-    client = _get_ssh_client(hostname_config, credentials['username'], credentials['password'])
-    log_files = []
-    if client:
-        try:
-            stdin, stdout, stderr = client.exec_command(f"ls {hostname_config['log_dir']}")
-            log_files = stdout.read().decode().strip().split('\n')
-            log_files = [f for f in log_files if f]  # Remove empty strings
-            log_files.sort()
-            client.close()
-        except Exception as e:
-            app_logger.error(f"Error fetching log files: {e}")
+    try:
+        log_files = log_files_future.result(timeout=LOG_LIST_TIMEOUT)
+    except Exception as e:
+        app_logger.error(f"Error fetching log files: {e}")
+        log_files = []
     
     return render_template('chat.html',
         hostname_key=hostname_key,
@@ -308,11 +569,8 @@ def analyze_log(hostname_key, filename):
     
     log_path = os.path.join(LOGS_DIR, filename)
     try:
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            log_content = f.read()
-        
-        analysis = log_analyzer.analyze_log_patterns(log_content)
-        return jsonify(analysis)
+        analysis = analyze_log_file(log_path)
+        return jsonify({**analysis, 'ips': sorted(analysis['ips'])})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -2,7 +2,7 @@ import os
 import re
 import shutil
 import subprocess
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Set
 
 from flask import Flask, jsonify, render_template, request
 import psutil
@@ -38,9 +38,56 @@ def start_process_by_name(process_name: str) -> int:
     return process.pid
 
 
+# pgrep treats its pattern as an extended regex; bracket each metacharacter
+# (backslash-escape ^, which is not literal first in a bracket) so it is
+# matched literally like the substring checks below.
+_ERE_SPECIAL = re.compile(r"[.\[\]()*+?{}|$\\]")
+
+
+def _ere_literal(text: str) -> str:
+    return _ERE_SPECIAL.sub(lambda m: "[%s]" % m.group(), text).replace("^", r"\^")
+
+
+# pgrep scans /proc in C and returns a superset of the exact matches (name or
+# command line containing process_name); None means fall back to psutil.
+def _pgrep_candidates(process_name: str) -> Optional[List[int]]:
+    pids: Set[int] = set()
+    pattern = _ere_literal(process_name)
+    for flags in ([], ["-f"]):
+        try:
+            result = subprocess.run(
+                ["pgrep", *flags, "--", pattern],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+            )
+        except OSError:
+            return None
+        if result.returncode > 1:  # 1 only means nothing matched
+            return None
+        pids.update(int(pid) for pid in result.stdout.split())
+    return sorted(pids)
+
+
+def _iter_candidate_processes(process_name: str) -> Iterator[psutil.Process]:
+    pids = _pgrep_candidates(process_name)
+    if pids is None:
+        yield from psutil.process_iter(["pid", "name", "cmdline"])
+        return
+
+    for pid in pids:
+        try:
+            proc = psutil.Process(pid)
+            # Same shape process_iter gives, so matching below is shared
+            proc.info = proc.as_dict(attrs=["pid", "name", "cmdline"])
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        yield proc
+
+
 def list_processes_matching(process_name: str) -> List[psutil.Process]:
     matches: List[psutil.Process] = []
-    for proc in psutil.process_iter(["pid", "name", "cmdline"]):
+    for proc in _iter_candidate_processes(process_name):
         try:
             name = proc.info.get("name") or ""
             cmdline = proc.info.get("cmdline") or []
@@ -3,6 +3,9 @@ import paramiko
 import os
 from datetime import datetime
 import re
+import shlex
+import socket
+import time
 from dotenv import load_dotenv
 import threading
 import queue
@@ -35,6 +38,10 @@ LOG_PATHS = [
     '/tmp/logs/'
 ]
 
+# live_tail batches output into one SSE event per this many bytes or seconds
+TAIL_FLUSH_BYTES = 4096
+TAIL_FLUSH_SECONDS = 0.05
+
 def get_ssh_connection(server_key):
     """Establish SSH connection to server"""
     try:
@@ -59,29 +66,79 @@ def get_ssh_connection(server_key):
         print(f"SSH Connection Error: {e}")
         return None
 
+class SSHPool:
+    """Keeps one long-lived SSH connection per server and reuses it across requests"""
+    
+    def __init__(self, keepalive=30):
+        self.keepalive = keepalive
+        self._clients = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+    
+    def _server_lock(self, server_key):
+        with self._lock:
+            return self._locks.setdefault(server_key, threading.Lock())
+    
+    @staticmethod
+    def _is_active(ssh):
+        transport = ssh.get_transport() if ssh else None
+        return transport is not None and transport.is_active()
+    
+    def get(self, server_key):
+        """Return a live connection for the server, connecting only if needed"""
+        with self._server_lock(server_key):
+            ssh = self._clients.get(server_key)
+            if self._is_active(ssh):
+                return ssh
+            if ssh:
+                ssh.close()
+            
+            ssh = get_ssh_connection(server_key)
+            if ssh:
+                ssh.get_transport().set_keepalive(self.keepalive)
+                self._clients[server_key] = ssh
+            else:
+                self._clients.pop(server_key, None)
+            return ssh
+    
+    def release(self, server_key):
+        """Hand a connection back; dead connections are dropped from the pool"""
+        with self._server_lock(server_key):
+            ssh = self._clients.get(server_key)
+            if ssh and not self._is_active(ssh):
+                ssh.close()
+                del self._clients[server_key]
+
+ssh_pool = SSHPool()
+
 def discover_log_files(server_key, path_filter=""):
     """Discover log files on the server"""
-    ssh = get_ssh_connection(server_key)
+    ssh = ssh_pool.get(server_key)
     if not ssh:
         return []
     
     log_files = []
     try:
-        for log_path in LOG_PATHS:
-            # Find files with common log extensions
-            command = f"find {log_path} -type f -name '*.log' -o -name '*.txt' -o -name '*.out' 2>/dev/null | head -50"
-            if path_filter:
-                command = f"find {log_path} -type f -name '*{path_filter}*' 2>/dev/null | head -50"
-            
-            stdin, stdout, stderr = ssh.exec_command(command)
-            files = stdout.read().decode().splitlines()
-            
-            for file_path in files:
-                if file_path:  # Ensure path is not empty
-                    log_files.append({
-                        'path': file_path,
-                        'name': os.path.basename(file_path)
-                    })
+        # Run every root's find in a single exec_command rather than one
+        # SSH round trip per path; each find keeps its own head -50 limit
+        if path_filter:
+            name_test = f"-name {shlex.quote(f'*{path_filter}*')}"
+        else:
+            name_test = r"\( -name '*.log' -o -name '*.txt' -o -name '*.out' \)"
+        command = '; '.join(
+            f"find {log_path} -type f {name_test} 2>/dev/null | head -50"
+            for log_path in LOG_PATHS
+        )
+        
+        stdin, stdout, stderr = ssh.exec_command(command)
+        files = stdout.read().decode().splitlines()
+        
+        for file_path in files:
+            if file_path:  # Ensure path is not empty
+                log_files.append({
+                    'path': file_path,
+                    'name': os.path.basename(file_path)
+                })
         
         # Remove duplicates
         seen = set()
@@ -97,19 +154,23 @@ def discover_log_files(server_key, path_filter=""):
         print(f"Error discovering log files: {e}")
         return []
     finally:
-        ssh.close()
+        ssh_pool.release(server_key)
 
-def search_in_file(server_key, file_path, search_text, max_lines=1000):
-    """Search for text in a log file"""
-    ssh = get_ssh_connection(server_key)
+def search_in_file(server_key, file_path, search_text, max_lines=1000, use_regex=False):
+    """Search for text in a log file (as a literal unless use_regex is set)"""
+    ssh = ssh_pool.get(server_key)
     if not ssh:
         return []
     
     try:
-        # Use grep to search for the text
-        command = f"grep -n -i '{search_text}' '{file_path}' | head -{max_lines}"
+        # Use grep to search for the text; -F matches it literally, and both
+        # arguments are quoted so they reach grep unchanged
+        mode = '' if use_regex else '-F '
+        command = 'grep -n -i %s-- %s %s | head -%d' % (
+            mode, shlex.quote(search_text), shlex.quote(file_path), max_lines
+        )
         stdin, stdout, stderr = ssh.exec_command(command)
-        results = stdout.read().decode().splitlines()
+        results = stdout.read().decode('utf-8', 'ignore').splitlines()
         
         formatted_results = []
         for result in results:
@@ -127,11 +188,11 @@ def search_in_file(server_key, file_path, search_text, max_lines=1000):
         print(f"Error searching file: {e}")
         return []
     finally:
-        ssh.close()
+        ssh_pool.release(server_key)
 
 def tail_file(server_key, file_path, lines=100):
     """Get last n lines of a file"""
-    ssh = get_ssh_connection(server_key)
+    ssh = ssh_pool.get(server_key)
     if not ssh:
         return []
     
@@ -144,7 +205,7 @@ def tail_file(server_key, file_path, lines=100):
         print(f"Error tailing file: {e}")
         return []
     finally:
-        ssh.close()
+        ssh_pool.release(server_key)
 
 @app.route('/')
 def index():
@@ -170,6 +231,7 @@ def search_logs():
     file_path = request.form.get('file_path')
     search_text = request.form.get('search_text')
     max_results = int(request.form.get('max_results', 100))
+    use_regex = request.form.get('use_regex') == 'on'
     
     if not all([server_key, file_path, search_text]):
         return jsonify({'error': 'Missing required fields'}), 400
@@ -177,7 +239,7 @@ def search_logs():
     if server_key not in SERVERS:
         return jsonify({'error': 'Invalid server'}), 400
     
-    results = search_in_file(server_key, file_path, search_text, max_results)
+    results = search_in_file(server_key, file_path, search_text, max_results, use_regex)
     
     return render_template('search_results.html', 
                          results=results,
@@ -201,6 +263,11 @@ def tail_logs():
     content = tail_file(server_key, file_path, lines)
     return jsonify({'content': content, 'file_path': file_path})
 
+def _sse_event(chunk):
+    """Format a chunk of log output as one SSE event, one data field per line"""
+    lines = chunk.decode('utf-8', 'ignore').split('\n')
+    return ''.join(f"data: {line}\n" for line in lines) + "\n"
+
 @app.route('/live_tail')
 def live_tail():
     """Live tail endpoint (SSE)"""
@@ -208,23 +275,55 @@ def live_tail():
     file_path = request.args.get('file_path')
     
     def generate():
-        ssh = get_ssh_connection(server_key)
+        ssh = ssh_pool.get(server_key)
         if not ssh:
             yield f"data: Error connecting to server\n\n"
             return
         
+        stdout = None
         try:
             # Use tail -f for live following
             command = f"tail -f '{file_path}'"
             stdin, stdout, stderr = ssh.exec_command(command)
             
-            for line in iter(stdout.readline, ""):
-                yield f"data: {line}\n\n"
+            # Coalesce output into one multi-line event per flush window
+            # instead of one event (and write) per log line
+            channel = stdout.channel
+            channel.settimeout(TAIL_FLUSH_SECONDS)
+            pending = b''
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    data = channel.recv(TAIL_FLUSH_BYTES)
+                except socket.timeout:
+                    data = None
+                if data == b'':  # tail exited
+                    break
+                if data:
+                    pending += data
                 
+                now = time.monotonic()
+                if pending and (len(pending) >= TAIL_FLUSH_BYTES or now - last_flush >= TAIL_FLUSH_SECONDS):
+                    # Hold back a partial last line unless the buffer is full
+                    complete, sep, rest = pending.rpartition(b'\n')
+                    if sep:
+                        pending = rest
+                    elif len(pending) >= TAIL_FLUSH_BYTES:
+                        complete, pending = pending, b''
+                    if sep or complete:
+                        yield _sse_event(complete)
+                        last_flush = now
+            
+            if pending:
+                yield _sse_event(pending)
+            
         except Exception as e:
             yield f"data: Error: {str(e)}\n\n"
         finally:
-            ssh.close()
+            # The connection is shared, so stop tail -f by closing its channel
+            if stdout is not None:
+                stdout.channel.close()
+            ssh_pool.release(server_key)
     
     return Response(generate(), mimetype='text/plain')
 